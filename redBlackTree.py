@@ -12,6 +12,8 @@ red-black properties:
 """
 
 class Node:
+    __slots__ = ('key', 'parent', 'left', 'right', 'color')    #no per-node __dict__
+
     def __init__(self, key):
         self.key = key
         self.parent = None
@@ -35,8 +37,50 @@ the root’s parent. The values of the attributes p, left, right, and key of the
 set them during the course of a procedure for our convenience.
 """
 import sys
+from bisect import bisect_left
+from collections import deque
+
+# The rotations are plain module functions taking the tree, so insert_fixup and fix_delete can bind them to a local
+# once and call them without a bound-method lookup per rotation. RedBlackTree.left_rotate/right_rotate wrap them.
+def _left_rotate(tree, x):  #left rotate at node x, clrs figure 13.2 (page 313)
+    nil = tree.nil
+    y = x.right         #set y as x's right child
+    x.right = y.left    #turn y's left subtree into x's right subtree
+    if y.left is not nil:
+        y.left.parent = x
+
+    xp = x.parent
+    y.parent = xp     #link x's parent to y
+    if xp is nil:
+        tree.root = y
+    elif x is xp.left:
+        xp.left = y
+    else:
+        xp.right = y
+    y.left = x      #put x on y's left
+    x.parent = y
+
+def _right_rotate(tree, y):  #right rotate at node y. Inverse operation of _left_rotate, the code is symmetric.
+    nil = tree.nil
+    x = y.left         #set x as y's left child
+    y.left = x.right   #turn x's right subtree into y's left subtree
+    if x.right is not nil:
+        x.right.parent = y
+
+    yp = y.parent
+    x.parent = yp     ##link y's parent to x
+    if yp is nil:
+        tree.root = x
+    elif y is yp.left:
+        yp.left = x
+    else:
+        yp.right = x
+    x.right = y     #put y on x's right
+    y.parent = x
 
 class RedBlackTree:
+    __slots__ = ('nil', 'root', 'leftmost', 'rightmost', '_frozen_keys', '_frozen_nodes', '_height')
+
     def __init__(self):
         self.nil = Node(0)  #see figure 13.1.b: RB tree with all NIL children, root.parent point to sentinel (nil)
         self.nil.color = 0
@@ -44,133 +88,155 @@ class RedBlackTree:
         self.nil.right = self.nil
         self.nil.parent = self.nil
         self.root = self.nil
+        self.leftmost = self.nil    #cached minimum and maximum nodes of the whole tree, nil while the tree is empty
+        self.rightmost = self.nil
+        self._frozen_keys = None     #sorted snapshot built by freeze(), dropped on any update
+        self._frozen_nodes = None
+        self._height = None     #height of the whole tree, computed by height() on demand and dropped on any update
 
     def get_root(self):
         return self.root
 
     def minimum(self, node):    #find the node with the minimum key
-        while node.left != self.nil:
+        if node is self.root:
+            return self.leftmost
+        nil = self.nil
+        while node.left is not nil:
             node = node.left
         return node
 
     def maximum(self, node):    #find the node with the maximum key
-        while node.right != self.nil:
+        if node is self.root:
+            return self.rightmost
+        nil = self.nil
+        while node.right is not nil:
             node = node.right
         return node
 
+    def min_key(self):
+        if self.root is self.nil:
+            return None
+        return self.leftmost.key
+
+    def max_key(self):
+        if self.root is self.nil:
+            return None
+        return self.rightmost.key
+
     def successor(self, x):     #find the successor of a given node, x
-        if x.right != self.nil:   #if the right subtree is not None, the successor is the leftmost node in the right subtree
+        nil = self.nil
+        if x.right is not nil:   #if the right subtree is not None, the successor is the leftmost node in the right subtree
             return self.minimum(x.right)
         y = x.parent    #else it is the lowest ancestor of x whose left child is also an ancestor of x
-        while y != self.nil and x == y.right:
+        while y is not nil and x is y.right:
             x = y
             y = y.parent
         return y
 
     def predecessor(self, x):
-        if x.left != self.nil:
+        nil = self.nil
+        if x.left is not nil:
             return self.maximum(x.left)
         y = x.parent
-        while y != self.nil and x == y.left:
+        while y is not nil and x is y.left:
             x = y
             y = y.parent
         return y
 
     def left_rotate(self, x):   #left rotate at node x, clrs figure 13.2 (page 313)
-        y = x.right         #set y as x's right child
-        x.right = y.left    #turn y's left subtree into x's right subtree
-        if y.left != self.nil:
-            y.left.parent = x
-
-        y.parent = x.parent     #link x's parent to y
-        if x.parent == self.nil:
-            self.root = y
-        elif x == x.parent.left:
-            x.parent.left = y
-        else:
-            x.parent.right = y
-        y.left = x      #put x on y's left
-        x.parent = y
-
-    def right_rotate(self, y):  #right rotate at node y. Inverse operation of left_rotate, the code is symmetric.
-        x = y.left         #set x as y's left child
-        y.left = x.right   #turn x's right subtree into y's left subtree
-        if x.right != self.nil:
-            x.right.parent = y
-
-        x.parent = y.parent     ##link y's parent to x
-        if y.parent == self.nil:
-            self.root = x
-        elif y == y.parent.left:
-            y.parent.left = x
-        else:
-            y.parent.right = x
-        x.right = y     #put y on x's right
-        y.parent = x
+        _left_rotate(self, x)
+        self._height = None     #called from outside insert/delete, so drop the cached height here
 
-    def insert(self, key):  #Ordinary bst insertion, at the end we call insert_fixup to maintain RB properties
-        z = Node(key)       #create a new node, z, with the given key argument
-        z.parent = self.nil
-        z.left = self.nil
-        z.right = self.nil
-        #z.color is already set to 1 (red) in Node class initialization
+    def right_rotate(self, y):  #right rotate at node y. Inverse operation of left_rotate
+        _right_rotate(self, y)
+        self._height = None
 
-        y = self.nil #y will serve as a pointer to previous node (parent of x), x pointer will find position to insert
+    def insert(self, key):  #Ordinary bst insertion, at the end we call insert_fixup to maintain RB properties
+        nil = self.nil
+        y = nil #y will serve as a pointer to previous node (parent of x), x pointer will find position to insert
         x = self.root
-        while x != self.nil:
+        go_left = False     #which side of y the new node goes on, remembered from the last comparison
+        while x is not nil:
             y = x
-            if z.key < x.key:
+            x_key = x.key
+            if key < x_key:
                 x = x.left
-            elif z.key > x.key:
-                x = x.right
-            else:
+                go_left = True
+            elif key == x_key:
                 print("key {} already exists in the tree".format(key))
                 return      # node.key == x.key -->> key already exists in the tree
+            else:
+                x = x.right
+                go_left = False
+
+        z = Node(key)       #only now create the new node, z, once we know the key is not a duplicate
         z.parent = y
-        if y == self.nil:       # an empty tree, make z the root node
+        z.left = nil
+        z.right = nil
+        #z.color is already set to 1 (red) in Node class initialization
+        self._frozen_keys = self._frozen_nodes = None   #the tree changes, any frozen snapshot is stale
+        self._height = None
+        if y is nil:       # an empty tree, make z the root node
             self.root = z
+            self.leftmost = self.rightmost = z
             z.color = 0
             return
-        elif z.key < y.key:
+        elif go_left:
             y.left = z
+            if y is self.leftmost:  #z hangs to the left of the old minimum, so it is the new minimum
+                self.leftmost = z
         else:
             y.right = z
+            if y is self.rightmost:
+                self.rightmost = z
         self.insert_fixup(z)
 
+    def insert_many(self, keys):    #same as calling insert for each key; to load an empty tree, from_sorted is faster
+        insert = self.insert
+        for key in keys:
+            insert(key)
+
 
     def insert_fixup(self, z):  #see figure 13.4 CLRS (page 317)
-        while z.parent.color == 1:  #we enter this loop iteration only if z.p is red, we know that z.p cannot be
-                                    # the root. Hence, z.p.p exists.
-            if z.parent == z.parent.parent.left:
-                y = z.parent.parent.right    # uncle
+        left_rotate = _left_rotate
+        right_rotate = _right_rotate
+        p = z.parent
+        while p.color == 1:  #we enter this loop iteration only if z.p is red, we know that z.p cannot be
+                             # the root. Hence, z.p.p exists.
+            g = p.parent     #p, g: z's parent and grandparent, read once per iteration
+            if p is g.left:
+                y = g.right    # uncle
                 if y.color == 1:           #case 1: z's uncle is red
-                    z.parent.color = 0
+                    p.color = 0
                     y.color = 0
-                    z.parent.parent.color = 1
-                    z = z.parent.parent   #The while loop continues with node z’s grandparent z.p.p as the new z
+                    g.color = 1
+                    z = g   #The while loop continues with node z’s grandparent z.p.p as the new z
                 else:
-                    if z == z.parent.right:  #case 2: z's uncle is black and z is a right child
-                        z = z.parent         #make z point to z.parent
-                        self.left_rotate(z)
-
-                    z.parent.color = 0       #case 3: z's uncle is black and z is a left child
-                    z.parent.parent.color = 1
-                    self.right_rotate(z.parent.parent) #The while loop does not iterate another time after this, since z.p is now black.
+                    if z is p.right:  #case 2: z's uncle is black and z is a right child
+                        z = p         #make z point to z.parent
+                        left_rotate(self, z)
+                        p = z.parent  #the old z; the rotation leaves g as its parent
+
+                    p.color = 0       #case 3: z's uncle is black and z is a left child
+                    g.color = 1
+                    right_rotate(self, g) #The while loop does not iterate another time after this, since z.p is now black.
             else:
-                y = z.parent.parent.left
+                y = g.left
                 if y.color == 1:
                     y.color = 0
-                    z.parent.color = 0
-                    z.parent.parent.color = 1
-                    z = z.parent.parent
+                    p.color = 0
+                    g.color = 1
+                    z = g
                 else:
-                    if z == z.parent.left:
-                        z = z.parent
-                        self.right_rotate(z)
+                    if z is p.left:
+                        z = p
+                        right_rotate(self, z)
+                        p = z.parent
 
-                    z.parent.color = 0
-                    z.parent.parent.color = 1
-                    self.left_rotate(z.parent.parent)
+                    p.color = 0
+                    g.color = 1
+                    left_rotate(self, g)
+            p = z.parent
 
         self.root.color = 0  #When the loop terminates, it does so because z.parent is black. (If z is the root,
                              #then z.parent is the sentinel TNULL, which is black) Thus, the tree does not violate
@@ -178,52 +244,146 @@ class RedBlackTree:
                              #to hold is property 2. This line of code restores this property,
 
 
+    # Bulk build from keys in increasing order: the middle key becomes the root and each half is built the same
+    # way, so every level is full except possibly the last. Coloring the nodes of an incomplete last level red and
+    # every other node black gives the same black count on all paths, so no rotation or fixup is needed: O(n).
+    @classmethod
+    def from_sorted(cls, sorted_keys):
+        tree = cls()
+        tree._build_sorted(list(sorted_keys))
+        return tree
+
+    def extend(self, keys):     #an empty tree is bulk built from the sorted keys, otherwise keys are inserted one by one
+        if self.root is self.nil:
+            unique = []
+            for key in sorted(keys):
+                if unique and key == unique[-1]:    #same message as insert gives for a key already in the tree
+                    print("key {} already exists in the tree".format(key))
+                else:
+                    unique.append(key)
+            self._build_sorted(unique)
+        else:
+            self.insert_many(keys)
+
+    def _build_sorted(self, keys):
+        for i in range(1, len(keys)):
+            if not keys[i-1] < keys[i]:
+                raise ValueError("keys must be strictly increasing, got {} before {}".format(keys[i-1], keys[i]))
+        nil = self.nil
+        red_depth = (len(keys) + 1).bit_length() - 1    #number of full levels; nodes below them are red
+
+        def build(lo, hi, depth, parent):
+            if lo > hi:
+                return nil
+            mid = (lo + hi) // 2
+            node = Node(keys[mid])
+            node.parent = parent
+            node.color = 1 if depth == red_depth else 0
+            node.left = build(lo, mid - 1, depth + 1, node)
+            node.right = build(mid + 1, hi, depth + 1, node)
+            return node
+
+        self.root = node = build(0, len(keys) - 1, 0, nil)
+        while node.left is not nil:
+            node = node.left
+        self.leftmost = node
+        node = self.root
+        while node.right is not nil:
+            node = node.right
+        self.rightmost = node
+        self._frozen_keys = self._frozen_nodes = None
+        self._height = None
+
     # transplant replaces the subtree rooted at node u with the subtree rooted at node v,
     # node u’s parent becomes node v’s parent, and u’s parent ends up having v as its appropriate child.
     def rb_transplant(self, u, v):
-        if u.parent == self.nil:
+        nil = self.nil
+        if u.parent is nil:
             self.root = v
-        elif u == u.parent.left:
+        elif u is u.parent.left:
             u.parent.left = v
         else:
             u.parent.right = v
         v.parent = u.parent    #we always assign to v.p even if v points to the sentinel
 
     def find(self, key):
-        if self.root == self.nil:
-            return self.nil
-        else:
-            return self.find_helper(key, self.root)
+        return self.find_helper(key, self.root)
+
+    def find_helper(self, key, node):   #iterative search of the subtree rooted at node
+        nil = self.nil
+        while node is not nil and node.key != key:
+            if key < node.key:
+                node = node.left
+            else:   #key > node.key
+                node = node.right
+        return node
 
-    def find_helper(self, key, node):
-        if node == self.nil or node.key == key:
-            return node
-        if key < node.key:
-            return self.find_helper(key, node.left)
-        else:   #key > root.value:
-            return self.find_helper(key, node.right)
+    # freeze copies the nodes, sorted by key, into two flat lists (keys and nodes). find_frozen then looks a key up
+    # with bisect_left, a binary search that runs in C, instead of stepping down the tree in Python. This speeds up
+    # lookups during read-heavy phases. The snapshot is dropped by the next insert or delete.
+    def freeze(self):
+        nil = self.nil
+        nodes = []
+        stack = []
+        node = self.root
+        while stack or node is not nil:     #in-order walk collects the nodes sorted by key
+            while node is not nil:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            nodes.append(node)
+            node = node.right
+        self._frozen_keys = [node.key for node in nodes]
+        self._frozen_nodes = nodes
+
+    def find_frozen(self, key):     #same result as find, served from the snapshot taken by freeze when there is one
+        keys = self._frozen_keys
+        if keys is None:
+            return self.find(key)
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            return self._frozen_nodes[i]
+        return self.nil
+
+    # in-order iteration over the keys: start at the cached minimum and follow successor, which climbs parent
+    # pointers instead of keeping a stack. The tree is never modified, so nested loops and lookups during the
+    # iteration see a consistent tree.
+    def __iter__(self):
+        nil = self.nil
+        successor = self.successor
+        node = self.leftmost
+        while node is not nil:
+            yield node.key
+            node = successor(node)
 
     def delete_node(self, key):
         z = self.find(key)
-        if z == self.nil:
+        if z is self.nil:
             print("Key is not in the tree")
             return
         self.delete_node_helper(z)
 
     def delete_node_helper(self, z):    #pseudocode and explanation: clrs chapter 13 (page 324)
+        nil = self.nil
+        self._frozen_keys = self._frozen_nodes = None
+        self._height = None
+        if z is self.leftmost:      #z has no left child, so its successor is a node that stays in the tree (or nil)
+            self.leftmost = self.successor(z)
+        if z is self.rightmost:
+            self.rightmost = self.predecessor(z)
         y = z   #maintain node y as the node either removed from the tree or moved within the tree
         y_original_color = y.color
-        if z.left == self.nil:
+        if z.left is nil:
             x = z.right
             self.rb_transplant(z, z.right)
-        elif z.right == self.nil:
+        elif z.right is nil:
             x = z.left
             self.rb_transplant(z, z.left)
         else:
             y = self.minimum(z.right)   #when z has 2 children, set y to z's successor
             y_original_color = y.color  #update y's original color
             x = y.right
-            if y.parent == z:
+            if y.parent is z:
                 x.parent = y
             else:
                 self.rb_transplant(y, y.right) #Replace y with it's right child, then we can transplant y into z position
@@ -240,133 +400,148 @@ class RedBlackTree:
 
 
     def fix_delete(self, x):
-        while x != self.nil and x.color == 0:
-            if x == x.parent.left:
-                w = x.parent.right      # w : sibling
+        nil = self.nil
+        left_rotate = _left_rotate
+        right_rotate = _right_rotate
+        while x is not nil and x.color == 0:
+            xp = x.parent   #rotations below move xp down but keep it as x's parent, so read it once per iteration
+            if x is xp.left:
+                w = xp.right      # w : sibling
                 if w.color == 1:        # case 1: x's sibling, w, is red
                     w.color = 0
-                    x.parent.color = 1
-                    self.left_rotate(x.parent)
-                    w = x.parent.right      # x now has a new sibling after rotation
+                    xp.color = 1
+                    left_rotate(self, xp)
+                    w = xp.right      # x now has a new sibling after rotation
                 
                 if w.left.color == 0 and w.right.color == 0:  #case 2: x's sibling, w, is black and both of w's children are black
                     w.color = 1
-                    x = x.parent    # new x
+                    x = xp    # new x
                 else:
                     if w.right.color == 0:  #case 3: x's sibling, w, is black, and w's left child is red, w's right child is black
                         w.left.color = 0
                         w.color = 1
-                        self.right_rotate(w)
-                        w = x.parent.right  # new w
+                        right_rotate(self, w)
+                        w = xp.right  # new w
 
-                    w.color = x.parent.color  #case 4: x's sibling, w, is black and w's right child is red
-                    x.parent.color = 0
+                    w.color = xp.color  #case 4: x's sibling, w, is black and w's right child is red
+                    xp.color = 0
                     w.right.color = 0
-                    self.left_rotate(x.parent)
+                    left_rotate(self, xp)
                     x = self.root   #new x = self.root  setting x to be the root causes the while loop to terminate
 
-            else:    # x == x.parent.right
-                w = x.parent.left
+            else:    # x is x.parent.right
+                w = xp.left
                 if w.color == 1:    # case 1 mirror
                     w.color = 0
-                    x.parent.color = 1
-                    self.right_rotate(x.parent)
-                    w = x.parent.left   # new w
+                    xp.color = 1
+                    right_rotate(self, xp)
+                    w = xp.left   # new w
 
                 if w.left.color == 0 and w.right.color == 0:    # case 2 mirror
                     w.color = 1
-                    x = x.parent    # new x
+                    x = xp    # new x
                 else:
                     if w.left.color == 0:   # case 3 mirror
                         w.right.color = 0
                         w.color = 1
-                        self.left_rotate(w)
-                        w = x.parent.left   # new w
+                        left_rotate(self, w)
+                        w = xp.left   # new w
 
-                    w.color = x.parent.color    # case 4 mirror
-                    x.parent.color = 0
+                    w.color = xp.color    # case 4 mirror
+                    xp.color = 0
                     w.left.color = 0
-                    self.right_rotate(x.parent)
+                    right_rotate(self, xp)
                     x = self.root
 
         x.color = 0
 
 
     def print_vertical(self):
-        stack = []
-        margin_stack = []
-        stack.append(self.root)
-        margin_stack.append((0, '_'))
-        while len(stack) > 0:
-            node = stack.pop()
-            margin, l_or_r_child = margin_stack.pop()
-            for i in range(margin):
-                print("     ", end='')
-            if margin > 0:
-                print(l_or_r_child + "---", end='')
-            else:
-                print('Root:', end='')
-
-            if node != self.nil:
-                if node.left != self.nil or node.right != self.nil:
-                    stack.append(node.right)
-                    margin_stack.append((margin+1, 'R'))
-                    stack.append(node.left)
-                    margin_stack.append((margin+1, 'L'))
-                print(node)
+        nil = self.nil
+        out = []    #collect the whole diagram and write it once
+        stack = [(self.root, 0, 'Root:')]     #node, margin and the line prefix ("     " * margin + "L---") to print
+        while stack:
+            node, margin, prefix = stack.pop()
+            if node is not nil:
+                if node.left is not nil or node.right is not nil:
+                    child_pad = "     " * (margin+1)   #shared by both children
+                    stack.append((node.right, margin+1, child_pad + "R---"))
+                    stack.append((node.left, margin+1, child_pad + "L---"))
+                out.append(prefix + str(node) + '\n')
             else:
-                print("[]")
+                out.append(prefix + "[]\n")
+        sys.stdout.write(''.join(out))
 
     #We'll need this height method to get max depth of the tree, for printing out a tree diagram horizontally
-    def height(self, node):
-        if node is self.nil:
+    def height(self, node):     #level-order walk, the depth of the last node dequeued is the height
+        nil = self.nil
+        if node is nil:
             return 0
-        else:
-            l_height = self.height(node.left)
-            r_height = self.height(node.right)
-
-            return max(l_height, r_height) + 1
+        is_root = node is self.root
+        if is_root and self._height is not None:
+            return self._height
+        max_depth = 0
+        queue = deque([(node, 1)])
+        while queue:
+            node, depth = queue.popleft()
+            max_depth = depth
+            if node.left is not nil:
+                queue.append((node.left, depth+1))
+            if node.right is not nil:
+                queue.append((node.right, depth+1))
+        if is_root:
+            self._height = max_depth
+        return max_depth
 
     def draw_tree(self):
         max_depth = self.height(self.root)
-        num_space = pow(2, max_depth) + 4
-        print('\n')
+        num_space = (1 << max_depth) + 4
+        out = ['\n\n']
         for i in range(max_depth):
-            self.print_graph(self.root, num_space, 1, i, 0)
-            num_space = num_space // 2
-            print('\n')
-
-
-    def print_graph(self, node, num_space, is_left, expected_level, curr_level):
-        if node == self.nil or curr_level > expected_level:
-            #for i in range(num_space//2):
-                #print('  test', end='')
-            return -1
-        if expected_level == curr_level:
-            for i in range(num_space//2):
-                print('   ', end='')
-            print(node, end='')
-        else:
-            self.print_graph(node.left, num_space, 1, expected_level, curr_level+1)
-            for i in range(num_space//2):
-                print(' ', end='')
-            self.print_graph(node.right, num_space, 0, expected_level, curr_level+1)
-            return
-
-rbt = RedBlackTree()
-rbt.insert(8)
-rbt.insert(18)
-rbt.insert(5)
-rbt.insert(15)
-rbt.insert(17)
-rbt.insert(25)
-rbt.insert(40)
-rbt.insert(80)
-rbt.print_vertical()
-rbt.delete_node(25)
-rbt.delete_node(100)
-rbt.print_vertical()
-rbt.draw_tree()
+            self.print_graph(self.root, num_space, 1, i, 0, out)
+            num_space >>= 1
+            out.append('\n\n')
+        sys.stdout.write(''.join(out))
+
+
+    def print_graph(self, node, num_space, is_left, expected_level, curr_level, out):
+        #in-order walk down to expected_level with an explicit stack: nodes above expected_level add the gap
+        #between their subtrees, nodes on expected_level add themselves. The pieces are appended to out.
+        nil = self.nil
+        half = num_space >> 1
+        node_pad = '   ' * half     #padding is the same for every node of this level, build it once
+        gap = ' ' * half
+        stack = []
+        while stack or (node is not nil and curr_level <= expected_level):
+            while node is not nil and curr_level < expected_level:
+                stack.append((node, curr_level))
+                node = node.left
+                curr_level += 1
+            if node is not nil and curr_level == expected_level:
+                out.append(node_pad)
+                out.append(str(node))
+            if not stack:
+                return
+            node, curr_level = stack.pop()
+            out.append(gap)
+            node = node.right
+            curr_level += 1
+
+if __name__ == '__main__':
+    rbt = RedBlackTree()
+    rbt.insert(8)
+    rbt.insert(18)
+    rbt.insert(5)
+    rbt.insert(15)
+    rbt.insert(17)
+    rbt.insert(25)
+    rbt.insert(40)
+    rbt.insert(80)
+    rbt.print_vertical()
+    rbt.delete_node(25)
+    rbt.delete_node(100)
+    rbt.print_vertical()
+    rbt.draw_tree()
 """
 Output:
 Root:17(BLACK)